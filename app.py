@@ -1,13 +1,16 @@
 from flask import Flask, render_template, request, jsonify, redirect, url_for, flash
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime, timedelta
-import requests
+from typing import List
+import html
+import msgspec
 import os
 from dotenv import load_dotenv
 from trello import TrelloClient
 import json
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
+from http_client import create_session
 
 # Carrega variáveis de ambiente
 load_dotenv()
@@ -18,6 +21,9 @@ app = Flask(__name__)
 if os.getenv('FLASK_ENV') == 'production':
     # Em produção, usa o caminho absoluto
     app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:////app/data/blog_trello.db'
+elif os.getenv('DATABASE_URL'):
+    # Fora de produção, permite apontar para outro banco (ex.: benchmarks)
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL')
 else:
     # Em desenvolvimento, usa o caminho relativo
     app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///blog_trello.db'
@@ -73,10 +79,23 @@ class User(UserMixin, db.Model):
 def load_user(user_id):
     return User.query.get(int(user_id))
 
+# Sessão HTTP compartilhada (conexões keep-alive por host) para WordPress e Trello
+http_session = create_session(
+    pool_connections=int(os.getenv('HTTP_POOL_CONNECTIONS', 10)),
+    pool_maxsize=int(os.getenv('HTTP_POOL_MAXSIZE', 10)),
+    timeout=(float(os.getenv('HTTP_CONNECT_TIMEOUT', 5)), float(os.getenv('HTTP_READ_TIMEOUT', 30))),
+    compression=os.getenv('HTTP_COMPRESSION', '1') == '1',
+    rate_limit=float(os.getenv('HTTP_RATE_LIMIT', 0)),
+    # O Trello permite 100 requisições a cada 10 segundos por token
+    rate_limits={'api.trello.com': (float(os.getenv('TRELLO_RATE_LIMIT', 10)),
+                                    int(os.getenv('TRELLO_RATE_BURST', 100)))}
+)
+
 # Configuração do cliente Trello
 trello_client = TrelloClient(
     api_key=os.getenv('TRELLO_API_KEY'),
-    token=os.getenv('TRELLO_TOKEN')
+    token=os.getenv('TRELLO_TOKEN'),
+    http_service=http_session
 )
 
 # Lista de URLs dos blogs
@@ -98,23 +117,40 @@ BLOG_URLS = [
    'https://blog.etalentos.com.br/wp-json/wp/v2/docs?doc_category=7&per_page=100',
 ]
 
+# Campos do WordPress usados pela aplicação (evita baixar conteúdo, resumo e meta)
+WP_FIELDS = 'title,link,modified,categories'
+
+class RenderedText(msgspec.Struct):
+    rendered: str
+
+class WordPressDoc(msgspec.Struct):
+    """Registro compacto com os campos usados de cada post do WordPress"""
+    title: RenderedText
+    link: str
+    modified: datetime
+    categories: List[int] = []
+
+wp_docs_decoder = msgspec.json.Decoder(List[WordPressDoc])
+
 def fetch_posts():
     """Busca posts de todas as URLs e atualiza o cache"""
     for url in BLOG_URLS:
         try:
-            response = requests.get(url)
+            response = http_session.get(url, params={'_fields': WP_FIELDS})
             if response.status_code == 200:
-                posts = response.json()
+                posts = wp_docs_decoder.decode(response.content)
                 for post in posts:
                     # Extrai o domínio para identificar a fonte
                     source = url.split('/')[2]
-                    category = post.get('categories', ['Sem categoria'])[0]
+                    category = post.categories[0] if post.categories else 'Sem categoria'
+                    # O WordPress devolve o título com entidades HTML (&#8211;, &amp;...)
+                    title = html.unescape(post.title.rendered)
                     
                     # Verifica se o post já existe no cache
-                    existing_post = Post.query.filter_by(url=post['link']).first()
+                    existing_post = Post.query.filter_by(url=post.link).first()
                     if existing_post:
-                        existing_post.title = post['title']['rendered']
-                        existing_post.updated_at = datetime.fromisoformat(post['modified'].replace('Z', '+00:00'))
+                        existing_post.title = title
+                        existing_post.updated_at = post.modified
                         existing_post.category = category
                         # Mantém a data da última revisão se já existir
                         if not existing_post.last_review_date:
@@ -123,9 +159,9 @@ def fetch_posts():
                             existing_post.update_review_status()
                     else:
                         new_post = Post(
-                            title=post['title']['rendered'],
-                            url=post['link'],
-                            updated_at=datetime.fromisoformat(post['modified'].replace('Z', '+00:00')),
+                            title=title,
+                            url=post.link,
+                            updated_at=post.modified,
                             category=category,
                             source=source,
                             review_status='never',
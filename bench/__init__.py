@@ -0,0 +1 @@
+"""Suíte de benchmark e carga da aplicação (execute com `python -m bench`)."""
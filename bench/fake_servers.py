@@ -0,0 +1,313 @@
+"""Servidores falsos do WordPress e do Trello usados pelos benchmarks.
+
+Os servidores rodam em um processo separado para que o tempo de CPU medido
+no processo do benchmark seja apenas o da aplicação. Cada servidor conta
+conexões, requisições e bytes enviados; os contadores podem ser lidos e
+zerados pelas rotas de controle `/__bench__/stats` e `/__bench__/reset`,
+que não entram na contagem.
+"""
+import gzip
+import json
+import multiprocessing
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+TRELLO_API_URL = 'https://api.trello.com/1/'
+
+# Incrementar sempre que uma mudança nos servidores falsos alterar as medições
+# (2: respostas gzip, TCP_NODELAY e redirecionamento do Trello após o limite
+# de taxa). Resultados de versões diferentes não são comparados.
+HARNESS_VERSION = 2
+
+BOARD_ID = 'board-bench'
+LIST_ID = 'list-bench'
+MEMBERS = [
+    {'id': 'member-%d' % i, 'fullName': 'Membro %d' % i, 'username': 'membro%d' % i}
+    for i in range(1, 6)
+]
+
+# Títulos com entidades HTML, como o WordPress devolve em `title.rendered`
+TITLE_TEMPLATES = [
+    'Como configurar a agenda &#8211; parte %d',
+    'Integração com WhatsApp &amp; e-mail (%d)',
+    'Perguntas frequentes sobre &#8220;cobrança&#8221; %d',
+    'Relatórios e indicadores do atendimento %d',
+]
+
+
+class _StatsHandler(BaseHTTPRequestHandler):
+    """Handler base com keep-alive, respostas JSON e contadores"""
+
+    protocol_version = 'HTTP/1.1'
+    # Como nginx/Apache (tcp_nodelay), evita atrasos de ACK em conexões keep-alive
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self._counted = False
+
+    def log_message(self, format, *args):
+        pass
+
+    def _record(self, nbytes):
+        stats = self.server.stats
+        with self.server.stats_lock:
+            if not self._counted:
+                stats['connections'] += 1
+                self._counted = True
+            stats['requests'] += 1
+            stats['bytes_sent'] += nbytes
+
+    def _send_json(self, obj, status=200, record=True):
+        body = json.dumps(obj).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=UTF-8')
+        if record and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body, compresslevel=6)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        if record:
+            self._record(len(body))
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _handle_control(self, path):
+        if path == '/__bench__/stats':
+            with self.server.stats_lock:
+                self._send_json(dict(self.server.stats), record=False)
+            return True
+        if path == '/__bench__/reset':
+            with self.server.stats_lock:
+                for key in self.server.stats:
+                    self.server.stats[key] = 0
+            self._send_json({'success': True}, record=False)
+            return True
+        return False
+
+    def do_POST(self):
+        if not self._handle_control(urlsplit(self.path).path):
+            self._send_json({'message': 'method not allowed'}, status=405)
+
+
+class WordPressHandler(_StatsHandler):
+    """Simula o endpoint `/wp-json/wp/v2/docs` com payload completo"""
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        if self._handle_control(parts.path):
+            return
+        if parts.path != '/wp-json/wp/v2/docs':
+            self._send_json({'code': 'rest_no_route'}, status=404)
+            return
+
+        query = parse_qs(parts.query)
+        category = int(query.get('doc_category', ['0'])[0])
+        per_page = int(query.get('per_page', ['10'])[0])
+        count = min(per_page, self.server.docs_per_category)
+        host = self.headers.get('Host', 'localhost')
+        docs = [self._make_doc(host, category, i) for i in range(count)]
+
+        # Como o WordPress, `_fields` limita os campos de primeiro nível da resposta
+        if '_fields' in query:
+            fields = {field.split('.')[0] for field in query['_fields'][0].split(',')}
+            docs = [{key: value for key, value in doc.items() if key in fields} for doc in docs]
+        self._send_json(docs)
+
+    def _make_doc(self, host, category, index):
+        doc_id = category * 100000 + index
+        modified = self.server.base_date - timedelta(days=(doc_id * 7) % 720)
+        slug = 'doc-%d-%d' % (category, index)
+        paragraph = '<p>Conteúdo de exemplo do tutorial %s.</p>\n' % slug
+        content = paragraph * max(1, self.server.content_bytes // len(paragraph))
+        return {
+            'id': doc_id,
+            'date': modified.strftime('%Y-%m-%dT%H:%M:%S'),
+            'date_gmt': modified.strftime('%Y-%m-%dT%H:%M:%S'),
+            'guid': {'rendered': 'https://%s/?post_type=docs&p=%d' % (host, doc_id)},
+            'modified': modified.strftime('%Y-%m-%dT%H:%M:%S'),
+            'modified_gmt': modified.strftime('%Y-%m-%dT%H:%M:%S'),
+            'slug': slug,
+            'status': 'publish',
+            'type': 'docs',
+            'link': 'https://%s/docs/%s/' % (host, slug),
+            'title': {'rendered': TITLE_TEMPLATES[index % len(TITLE_TEMPLATES)] % index},
+            'content': {'rendered': content, 'protected': False},
+            'excerpt': {'rendered': paragraph, 'protected': False},
+            'author': 1,
+            'featured_media': 0,
+            'comment_status': 'closed',
+            'ping_status': 'closed',
+            'template': '',
+            'meta': {'_betterdocs_meta_views': index, '_betterdocs_reactions': []},
+            'doc_category': [category],
+            'doc_tag': [],
+            'categories': [category],
+        }
+
+
+class TrelloHandler(_StatsHandler):
+    """Simula as rotas da API do Trello usadas pela aplicação"""
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if self._handle_control(path):
+            return
+        if path == '/1/boards/%s' % BOARD_ID:
+            self._send_json({'id': BOARD_ID, 'name': 'Board', 'desc': '',
+                             'closed': False, 'url': 'https://trello.com/b/bench'})
+        elif path == '/1/boards/%s/members' % BOARD_ID:
+            self._send_json(MEMBERS)
+        elif path == '/1/lists/%s' % LIST_ID:
+            self._send_json({'id': LIST_ID, 'name': 'Lista', 'closed': False,
+                             'pos': 1, 'idBoard': BOARD_ID})
+        else:
+            self._send_json({'message': 'not found'}, status=404)
+
+    def do_POST(self):
+        path = urlsplit(self.path).path
+        if self._handle_control(path):
+            return
+        body = self._read_body()
+        if path == '/1/cards':
+            self._send_json(self._make_card(json.loads(body or b'{}')))
+        elif path.startswith('/1/cards/'):
+            self._send_json([])
+        else:
+            self._send_json({'message': 'not found'}, status=404)
+
+    def _make_card(self, args):
+        with self.server.stats_lock:
+            self.server.card_seq += 1
+            card_id = 'card-%d' % self.server.card_seq
+        return {
+            'id': card_id,
+            'name': args.get('name', ''),
+            'desc': args.get('desc', ''),
+            'due': args.get('due'),
+            'dueComplete': False,
+            'closed': False,
+            'url': 'https://trello.com/c/%s' % card_id,
+            'shortUrl': 'https://trello.com/c/%s' % card_id,
+            'pos': 1,
+            'idMembers': [],
+            'idLabels': [],
+            'idBoard': BOARD_ID,
+            'idList': args.get('idList', LIST_ID),
+            'idShort': self.server.card_seq,
+            'idChecklists': [],
+            'labels': [],
+            'badges': {'checkItems': 0, 'comments': 0},
+            'dateLastActivity': datetime.now().isoformat(),
+        }
+
+
+def _make_server(handler_cls, **attrs):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler_cls)
+    server.daemon_threads = True
+    server.stats = {'connections': 0, 'requests': 0, 'bytes_sent': 0}
+    server.stats_lock = threading.Lock()
+    for name, value in attrs.items():
+        setattr(server, name, value)
+    return server
+
+
+def _serve(conn, wordpress_hosts, docs_per_category, content_bytes):
+    servers = {}
+    base_date = datetime(2024, 6, 1)
+    for host in wordpress_hosts:
+        servers[host] = _make_server(WordPressHandler, docs_per_category=docs_per_category,
+                                     content_bytes=content_bytes, base_date=base_date)
+    servers['trello'] = _make_server(TrelloHandler, card_seq=0)
+
+    for server in servers.values():
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    conn.send({name: 'http://127.0.0.1:%d' % server.server_address[1]
+               for name, server in servers.items()})
+    conn.recv()  # bloqueia até o processo principal pedir o encerramento
+    for server in servers.values():
+        server.shutdown()
+        server.server_close()
+
+
+class FakeServers:
+    """Sobe os servidores falsos em um processo filho"""
+
+    def __init__(self, wordpress_hosts, docs_per_category=100, content_bytes=4000):
+        self._conn, child_conn = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(
+            target=_serve,
+            args=(child_conn, list(wordpress_hosts), docs_per_category, content_bytes),
+            daemon=True,
+        )
+        self._process.start()
+        self.urls = self._conn.recv()
+
+    @property
+    def trello_url(self):
+        return self.urls['trello']
+
+    def wordpress_url(self, host):
+        return self.urls[host]
+
+    def stats(self):
+        """Retorna os contadores de todos os servidores, somados em `total`"""
+        result = {}
+        total = {'connections': 0, 'requests': 0, 'bytes_sent': 0}
+        for name, url in self.urls.items():
+            result[name] = requests.get(url + '/__bench__/stats').json()
+            for key in total:
+                total[key] += result[name][key]
+        result['total'] = total
+        return result
+
+    def reset(self):
+        for url in self.urls.values():
+            requests.post(url + '/__bench__/reset')
+
+    def stop(self):
+        self._conn.send('stop')
+        self._process.join(timeout=5)
+
+
+class TrelloRedirectAdapter(HTTPAdapter):
+    """Adapter para `https://api.trello.com/` que envia as chamadas ao servidor falso.
+
+    O redirecionamento acontece no transporte, depois que a sessão da aplicação
+    já aplicou o limite de taxa configurado para `api.trello.com`.
+    """
+
+    def __init__(self, base_url, **kwargs):
+        super().__init__(**kwargs)
+        self.base_url = base_url.rstrip('/') + '/1/'
+
+    def send(self, request, **kwargs):
+        if request.url.startswith(TRELLO_API_URL):
+            request.url = self.base_url + request.url[len(TRELLO_API_URL):]
+        return super().send(request, **kwargs)
+
+
+class TrelloRedirect:
+    """Encaminha as chamadas do TrelloClient para o servidor falso.
+
+    Usado apenas com versões da aplicação anteriores à sessão HTTP
+    compartilhada (`--app-dir`), que chamam o módulo `requests` diretamente.
+    """
+
+    def __init__(self, http_service, base_url):
+        self.http_service = http_service
+        self.base_url = base_url.rstrip('/') + '/1/'
+
+    def request(self, method, url, **kwargs):
+        if url.startswith(TRELLO_API_URL):
+            url = self.base_url + url[len(TRELLO_API_URL):]
+        return self.http_service.request(method, url, **kwargs)
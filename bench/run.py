@@ -0,0 +1,396 @@
+"""Executa os benchmarks e grava os resultados em JSON.
+
+Uso:
+    python -m bench --sizes 1000,100000,1000000 --output bench_results.json
+    python -m bench --baseline bench_baseline.json --threshold 0.25
+    python -m bench --sizes 1000000 --scenarios index,mark_recent_posts_updated
+    python -m bench --app-dir /tmp/blog-trello-v1 --output bench_baseline.json
+
+Para cada tamanho de tabela a base é recriada com posts sintéticos e são
+medidos: `index()` com várias combinações de filtros, `/refresh_posts` contra
+servidores WordPress falsos, o fluxo de cards em lote (sem o limite de taxa do
+Trello, verificado à parte em `trello_rate_limit`) e
+`/mark_recent_posts_updated`. Com `--baseline`, cada cenário é comparado pela
+mediana do tempo de relógio (ou, em `http_pool`, pelo número de conexões) e o
+processo termina com código 1 se algum cenário piorar além do limite.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+
+from bench.fake_servers import (BOARD_ID, HARNESS_VERSION, LIST_ID, MEMBERS, FakeServers,
+                                TrelloRedirect, TrelloRedirectAdapter)
+from bench.seed import seed_posts
+
+def _index_filters(anchor):
+    """Filtros do `index()`; as datas são relativas à âncora da base sintética"""
+    def days_ago(days):
+        return (anchor - timedelta(days=days)).strftime('%Y-%m-%d')
+
+    return {
+        'sem_filtros': {},
+        'categoria': {'category': '35'},
+        'status': {'status': 'old'},
+        'busca': {'search': 'configurar'},
+        'fonte': {'source': 'blog.eagenda.com.br'},
+        'periodo': {'date_from': days_ago(365), 'date_to': days_ago(180)},
+        'combinado': {'category': '35', 'status': 'never', 'search': 'agenda',
+                      'source': 'blog.eagenda.com.br', 'date_from': days_ago(540)},
+        'pagina_profunda': {'page': '50', 'per_page': '48'},
+    }
+
+BATCH_CARDS = 10
+
+# Cenários comparados pelo número de conexões, não pelo tempo
+CONNECTION_SCENARIOS = ('http_pool',)
+# Cenários dominados por esperas do limite de taxa; só verificam o espaçamento
+PACING_SCENARIOS = ('trello_rate_limit',)
+
+# Limite reduzido usado em `trello_rate_limit`: 60 chamadas, rajada de 10
+PACING_RATE = 50
+PACING_BURST = 10
+
+
+def _summary(samples):
+    return {
+        'min': min(samples),
+        'median': statistics.median(samples),
+        'mean': statistics.mean(samples),
+        'max': max(samples),
+    }
+
+
+def measure(fn, repeat, setup=None):
+    """Mede `fn` após uma execução de aquecimento; `setup` não é cronometrado"""
+    if setup:
+        setup()
+    fn()
+
+    wall, cpu = [], []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        fn()
+        wall.append(time.perf_counter() - wall_start)
+        cpu.append(time.process_time() - cpu_start)
+    return {'runs': repeat, 'wall': _summary(wall), 'cpu': _summary(cpu)}
+
+
+def _check(response):
+    if response.status_code != 200:
+        raise RuntimeError('HTTP %d: %s' % (response.status_code, response.get_data(as_text=True)[:200]))
+    if response.is_json and response.get_json().get('success') is False:
+        raise RuntimeError(response.get_json().get('error'))
+    return response
+
+
+def _with_http_stats(servers, fn):
+    """Envolve `fn` para guardar os contadores HTTP da última execução"""
+    stats = {}
+
+    def wrapped():
+        servers.reset()
+        fn()
+        stats.update(servers.stats()['total'])
+    return wrapped, stats
+
+
+def _batch_cards(client):
+    """Cria BATCH_CARDS cards como o front-end faz, um por requisição"""
+    for index in range(BATCH_CARDS):
+        _check(client.post('/create_batch_cards', json={
+            'card_type': 'canva',
+            'canva_type': 'post',
+            'source': 'blog.eagenda.com.br',
+            'assignees': [m['id'] for m in MEMBERS[:3]],
+            'distribute_week': True,
+            'titles': ['Card de benchmark %d' % index],
+            'card_index': index,
+        }))
+
+
+def _trello_rate_limit(app_module, client, servers):
+    """Verifica que as chamadas ao Trello respeitam o limite de taxa da sessão"""
+    session = app_module.http_session
+    session.set_rate_limit('api.trello.com', PACING_RATE, PACING_BURST)
+    try:
+        servers.reset()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        _batch_cards(client)
+        wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+        stats = servers.stats()['trello']
+    finally:
+        session.set_rate_limit('api.trello.com', 0)
+
+    # Depois da rajada, cada requisição espera 1/PACING_RATE segundos
+    expected = (stats['requests'] - PACING_BURST) / PACING_RATE
+    if wall < expected * 0.9:
+        raise RuntimeError('%d chamadas ao Trello em %.2fs; o limite exigiria ao menos %.2fs'
+                           % (stats['requests'], wall, expected))
+    return {'runs': 1, 'wall': _summary([wall]), 'cpu': _summary([cpu]),
+            'expected_min_wall': expected, 'http': stats}
+
+
+def _http_pool(app_module, client, servers):
+    """Conta as conexões abertas por um refresh e um card partindo de pools vazios"""
+    app_module.http_session.close()
+    servers.reset()
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    _check(client.get('/refresh_posts'))
+    _check(client.post('/create_batch_cards', json={
+        'card_type': 'post', 'assignees': [MEMBERS[0]['id']], 'titles': ['Card de conexões']}))
+    wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+    stats = servers.stats()
+
+    # Com keep-alive cada host deve receber uma única conexão
+    for name, item in stats.items():
+        if name != 'total' and item['connections'] > 1:
+            raise RuntimeError('%s recebeu %d conexões para %d requisições'
+                               % (name, item['connections'], item['requests']))
+    return {'runs': 1, 'wall': _summary([wall]), 'cpu': _summary([cpu]), 'http': stats}
+
+
+def _login(client, db, User):
+    user = User(username='bench')
+    user.set_password('bench')
+    db.session.add(user)
+    db.session.commit()
+    response = client.post('/login', data={'username': 'bench', 'password': 'bench'})
+    if response.status_code != 302:
+        raise RuntimeError('Falha no login do benchmark')
+
+
+def run_size(app_module, servers, size, repeat, scenarios=None):
+    """Executa os cenários selecionados para uma tabela com `size` posts"""
+    app, db, Post, User = app_module.app, app_module.db, app_module.Post, app_module.User
+    results = {}
+
+    def enabled(name):
+        return not scenarios or any(name.startswith(prefix) for prefix in scenarios)
+
+    # Âncora das datas da base: meia-noite de hoje, para que os filtros por dia
+    # selecionem sempre a mesma fração de posts. Continua perto de `now()`
+    # porque `mark_recent_posts_updated` usa os últimos 30 dias reais.
+    anchor = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    with app.app_context():
+        seed_start = time.perf_counter()
+        seed_posts(db, Post, size, anchor)
+        print('  base com %d posts criada em %.1fs' % (size, time.perf_counter() - seed_start))
+
+        client = app.test_client()
+        _login(client, db, User)
+
+        for name, params in _index_filters(anchor).items():
+            if not enabled('index/%s' % name):
+                continue
+            results['index/%s' % name] = measure(
+                lambda: _check(client.get('/', query_string=params)), repeat)
+
+        if enabled('http_pool') and hasattr(app_module, 'http_session'):
+            results['http_pool'] = _http_pool(app_module, client, servers)
+
+        if enabled('refresh_posts'):
+            refresh, refresh_stats = _with_http_stats(
+                servers, lambda: _check(client.get('/refresh_posts')))
+            results['refresh_posts'] = measure(refresh, repeat)
+            results['refresh_posts']['http'] = refresh_stats
+
+        cutoff = anchor - timedelta(days=30)
+
+        def reset_recent():
+            db.session.execute(
+                Post.__table__.update()
+                .where(Post.updated_at >= cutoff)
+                .values(review_status='never', last_review_date=None))
+            db.session.commit()
+
+        if enabled('mark_recent_posts_updated'):
+            results['mark_recent_posts_updated'] = measure(
+                lambda: _check(client.post('/mark_recent_posts_updated')), repeat, setup=reset_recent)
+
+        if enabled('create_batch_cards'):
+            batch_cards, batch_stats = _with_http_stats(servers, lambda: _batch_cards(client))
+            results['create_batch_cards'] = measure(batch_cards, repeat)
+            results['create_batch_cards']['http'] = batch_stats
+            results['create_batch_cards']['cards_per_run'] = BATCH_CARDS
+
+        session = getattr(app_module, 'http_session', None)
+        if enabled('trello_rate_limit') and hasattr(session, 'set_rate_limit'):
+            results['trello_rate_limit'] = _trello_rate_limit(app_module, client, servers)
+
+        db.session.remove()
+
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Compara as medianas de tempo com a baseline.
+
+    Cenários de `CONNECTION_SCENARIOS` têm uma única amostra de tempo e são
+    comparados pelo total de conexões abertas: qualquer aumento é regressão.
+    Cenários de `PACING_SCENARIOS` medem esperas do limite de taxa e não são
+    comparados; eles próprios falham se o espaçamento não for respeitado.
+    """
+    comparison = {}
+    for key, current in results.items():
+        previous = baseline.get('results', {}).get(key)
+        if not previous or key.split('/', 1)[1] in PACING_SCENARIOS:
+            continue
+        if key.split('/', 1)[1] in CONNECTION_SCENARIOS:
+            before = previous['http']['total']['connections']
+            after = current['http']['total']['connections']
+            comparison[key] = {
+                'baseline_connections': before,
+                'current_connections': after,
+                'ratio': after / before if before else float(after > 0),
+                'regression': after > before,
+            }
+            continue
+        before = previous['wall']['median']
+        after = current['wall']['median']
+        ratio = after / before if before else float('inf')
+        comparison[key] = {
+            'baseline_median': before,
+            'current_median': after,
+            'ratio': ratio,
+            'regression': ratio > 1 + threshold,
+        }
+    return comparison
+
+
+def _git_commit(path=None):
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], text=True, cwd=path,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _prepare_environment(workdir):
+    """Configura o ambiente antes de importar a aplicação"""
+    # Fora de produção para que `DATABASE_URL` seja respeitado pela aplicação
+    os.environ['FLASK_ENV'] = 'development'
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(workdir, 'bench.db')
+    os.environ['TRELLO_API_KEY'] = 'bench'
+    os.environ['TRELLO_TOKEN'] = 'bench'
+    os.environ['TRELLO_BOARD_ID'] = BOARD_ID
+    os.environ['TRELLO_LIST_ID'] = LIST_ID
+    # O fluxo de cards é medido sem as esperas do limite de taxa do Trello;
+    # o espaçamento é verificado à parte em `trello_rate_limit`
+    os.environ['TRELLO_RATE_LIMIT'] = '0'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks do Blog Trello')
+    parser.add_argument('--sizes', default='1000,100000,1000000',
+                        help='tamanhos da tabela de posts, separados por vírgula')
+    parser.add_argument('--repeat', type=int, default=5, help='execuções medidas por cenário')
+    parser.add_argument('--scenarios',
+                        help='prefixos dos cenários a executar, separados por vírgula '
+                             '(ex.: index,refresh_posts); padrão: todos')
+    parser.add_argument('--output', default='bench_results.json', help='arquivo JSON de saída')
+    parser.add_argument('--baseline', help='JSON de uma execução anterior para comparação')
+    parser.add_argument('--app-dir',
+                        help='diretório com outra versão de app.py (ex.: um git worktree), '
+                             'para medir versões anteriores com a suíte atual')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='aumento relativo da mediana considerado regressão')
+    args = parser.parse_args(argv)
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    scenarios = [name for name in (args.scenarios or '').split(',') if name]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        _prepare_environment(workdir)
+        if args.app_dir:
+            sys.path.insert(0, os.path.abspath(args.app_dir))
+        import app as app_module
+
+        # Versões anteriores a `DATABASE_URL` usariam o banco real do checkout,
+        # que seria apagado por `seed_posts`
+        database_uri = app_module.app.config['SQLALCHEMY_DATABASE_URI']
+        if database_uri != os.environ['DATABASE_URL']:
+            print('Abortado: a aplicação usa %s em vez do banco temporário do benchmark '
+                  '(versões sem suporte a DATABASE_URL não podem ser medidas).' % database_uri)
+            return 2
+
+        hosts = sorted({urlsplit(url).netloc for url in app_module.BLOG_URLS})
+        servers = FakeServers(hosts)
+        try:
+            # Aponta a aplicação para os servidores falsos
+            app_module.BLOG_URLS[:] = [
+                servers.wordpress_url(urlsplit(url).netloc) + url.split(urlsplit(url).netloc, 1)[1]
+                for url in app_module.BLOG_URLS
+            ]
+            if hasattr(app_module, 'http_session'):
+                app_module.http_session.mount(
+                    'https://api.trello.com/', TrelloRedirectAdapter(servers.trello_url))
+            else:
+                app_module.trello_client.http_service = TrelloRedirect(
+                    app_module.trello_client.http_service, servers.trello_url)
+
+            results = {}
+            for size in sizes:
+                print('Tabela com %d posts' % size)
+                for key, value in run_size(app_module, servers, size, args.repeat, scenarios).items():
+                    results['%d/%s' % (size, key)] = value
+                    print('  %-40s mediana %.4fs' % (key, value['wall']['median']))
+        finally:
+            servers.stop()
+
+    output = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'commit': _git_commit(args.app_dir),
+            'harness': HARNESS_VERSION,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'sizes': sizes,
+            'repeat': args.repeat,
+            'scenarios': scenarios or 'all',
+        },
+        'results': results,
+    }
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        output['meta']['baseline'] = args.baseline
+        output['meta']['threshold'] = args.threshold
+        baseline_harness = baseline.get('meta', {}).get('harness', 1)
+        if baseline_harness != HARNESS_VERSION:
+            print('Baseline gerada com a versão %d da suíte (atual: %d); comparação ignorada. '
+                  'Gere uma nova baseline, se preciso com --app-dir.' % (baseline_harness, HARNESS_VERSION))
+            output['comparison'] = {}
+        else:
+            output['comparison'] = compare(results, baseline, args.threshold)
+        regressions = [key for key, item in output['comparison'].items() if item['regression']]
+        for key, item in output['comparison'].items():
+            if 'current_connections' in item:
+                detail = '%d -> %d conexões' % (item['baseline_connections'], item['current_connections'])
+            else:
+                detail = '%.2fx' % item['ratio']
+            print('%-48s %s%s' % (key, detail, '  REGRESSÃO' if item['regression'] else ''))
+
+    with open(args.output, 'w') as f:
+        json.dump(output, f, indent=2)
+    print('Resultados gravados em %s' % args.output)
+
+    if regressions:
+        print('%d cenário(s) com regressão (limite de tempo: %.0f%%)' % (len(regressions), args.threshold * 100))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""Geração da tabela `Post` sintética para os benchmarks"""
+import random
+from datetime import timedelta
+
+SOURCES = [
+    'meuatendimentovirtual.com.br',
+    'blog.eagenda.com.br',
+    'blog.etalentos.com.br',
+]
+CATEGORIES = ['4', '7', '8', '9', '27', '28', '29', '30', '32', '35', '45', '46', '50', '51']
+WORDS = ['agenda', 'atendimento', 'configurar', 'cobrança', 'WhatsApp', 'relatório',
+         'integração', 'vagas', 'currículo', 'notificações', 'usuários', 'horários']
+
+CHUNK_SIZE = 50000
+
+
+def seed_posts(db, Post, rows, anchor, seed=42):
+    """Recria as tabelas e insere `rows` posts sintéticos em lotes.
+
+    As datas ficam nos 720 dias anteriores a `anchor`; os filtros de data dos
+    benchmarks são calculados a partir da mesma âncora.
+    """
+    rnd = random.Random(seed)
+
+    db.drop_all()
+    db.create_all()
+
+    table = Post.__table__
+    for start in range(0, rows, CHUNK_SIZE):
+        batch = []
+        for i in range(start, min(start + CHUNK_SIZE, rows)):
+            source = SOURCES[i % len(SOURCES)]
+            # 50% nunca revisados, 20% recentes e 30% antigos
+            bucket = rnd.random()
+            if bucket < 0.5:
+                status, last_review = 'never', None
+            elif bucket < 0.7:
+                status, last_review = 'recent', anchor - timedelta(days=rnd.randint(0, 29))
+            else:
+                status, last_review = 'old', anchor - timedelta(days=rnd.randint(30, 720))
+            batch.append({
+                'title': 'Como usar %s e %s no sistema %d' % (
+                    rnd.choice(WORDS), rnd.choice(WORDS), i),
+                'url': 'https://%s/docs/seed-%d/' % (source, i),
+                'updated_at': anchor - timedelta(minutes=rnd.randint(0, 720 * 24 * 60)),
+                'category': rnd.choice(CATEGORIES),
+                'source': source,
+                'trello_card_id': None,
+                'last_review_date': last_review,
+                'review_status': status,
+            })
+        db.session.execute(table.insert(), batch)
+    db.session.commit()
@@ -0,0 +1,94 @@
+"""Camada HTTP compartilhada para o tráfego de saída (WordPress e Trello).
+
+Uma única `requests.Session` mantém pools de conexões keep-alive por host,
+aplica timeout padrão, controla a compressão das respostas e limita a taxa
+de requisições por host no lado do cliente.
+"""
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class RateLimiter:
+    """Token bucket thread-safe: no máximo `rate` requisições por segundo"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Aguarda até haver um token disponível e retorna o tempo de espera"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # O token é reservado mesmo quando é preciso esperar, assim as
+            # próximas chamadas aguardam a sua vez na fila
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+class OutboundSession(requests.Session):
+    """Session com timeout padrão e limite de taxa por host"""
+
+    def __init__(self, timeout=None, rate_limit=0, rate_limits=None):
+        super().__init__()
+        self.timeout = timeout
+        self.rate_limit = rate_limit
+        self.rate_limits = dict(rate_limits or {})
+        self._limiters = {}
+        self._limiters_lock = threading.Lock()
+
+    def set_rate_limit(self, host, rate, burst=None):
+        """Altera o limite de um host; `rate=0` desativa"""
+        with self._limiters_lock:
+            self.rate_limits[host] = (rate, burst)
+            self._limiters.pop(host, None)
+
+    def _limiter_for(self, host):
+        limit = self.rate_limits.get(host, self.rate_limit)
+        rate, burst = limit if isinstance(limit, tuple) else (limit, None)
+        if not rate:
+            return None
+        with self._limiters_lock:
+            if host not in self._limiters:
+                self._limiters[host] = RateLimiter(rate, burst)
+            return self._limiters[host]
+
+    def request(self, method, url, **kwargs):
+        # Um `timeout=None` explícito desativa o timeout padrão
+        if 'timeout' not in kwargs:
+            kwargs['timeout'] = self.timeout
+        limiter = self._limiter_for(urlsplit(url).hostname)
+        if limiter:
+            limiter.acquire()
+        return super().request(method, url, **kwargs)
+
+
+def create_session(pool_connections=10, pool_maxsize=10, timeout=(5, 30),
+                   compression=True, rate_limit=0, rate_limits=None):
+    """Cria a sessão de saída.
+
+    :pool_connections: quantidade de hosts com pool mantido em cache
+    :pool_maxsize: conexões keep-alive mantidas por host
+    :timeout: timeout padrão (conexão, leitura) em segundos
+    :compression: aceita respostas gzip/deflate quando True
+    :rate_limit: requisições por segundo por host (0 desativa)
+    :rate_limits: limites específicos por host, em requisições por segundo ou
+                  (taxa, rajada), ex.: {'api.trello.com': (10, 100)}
+    """
+    session = OutboundSession(timeout=timeout, rate_limit=rate_limit, rate_limits=rate_limits)
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers['Accept-Encoding'] = 'gzip, deflate' if compression else 'identity'
+    return session